@@ -1,119 +1,127 @@
-import json
+import os
+import re
 import yaml
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .utils import FileUtils, RepoScan, iter_lines, json_loads, read_prefix
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+# Package name at the start of a requirements.txt line (PEP 508 names start alphanumeric)
+_REQUIREMENT_NAME = re.compile(rb'^\s*([A-Za-z0-9][A-Za-z0-9_.\-]*)')
+
+# Manifest files mapped to the frameworks their contents can reveal
+_FRAMEWORK_INDICATORS = {
+    'package.json': ['react', 'vue', 'angular', 'express', 'fastify', 'next'],
+    'requirements.txt': ['django', 'flask', 'fastapi', 'tornado'],
+    'pom.xml': ['spring', 'hibernate'],
+    'go.mod': ['gin', 'echo', 'fiber'],
+    'Cargo.toml': ['actix', 'rocket', 'warp']
+}
+
+_FRAMEWORK_TOKENS = {framework: framework.encode('ascii')
+                     for framework_list in _FRAMEWORK_INDICATORS.values()
+                     for framework in framework_list}
+
+# Frameworks are declared near the top of manifests, so larger files are truncated
+_FRAMEWORK_SCAN_BYTES = 256 * 1024
+
+# JSON specs up to this size are loaded whole, which is faster than ijson's
+# per-event loop; only larger ones are streamed to bound memory use
+_SPEC_STREAM_BYTES = 32 * 1024 * 1024
 
 
 class CodeAnalyzer:
     """Analyzes code structure and patterns in the repository."""
     
-    def analyze_codebase(self, repo_path: Path) -> str:
+    def analyze_codebase(self, repo_path: Path, scan: Optional[RepoScan] = None) -> str:
         """Analyze the codebase and return key insights."""
         insights = []
+        if scan is None:
+            scan = FileUtils().walk_repo(repo_path)
         
         # Detect programming languages
-        languages = self._detect_languages(repo_path)
+        languages = self._detect_languages(scan)
         if languages:
             insights.append(f"Programming Languages: {', '.join(languages)}")
         
         # Detect frameworks
-        frameworks = self._detect_frameworks(repo_path)
+        frameworks = self._detect_frameworks(repo_path, scan.root_names)
         if frameworks:
             insights.append(f"Frameworks: {', '.join(frameworks)}")
         
         # Find main entry points
-        entry_points = self._find_entry_points(repo_path)
+        entry_points = self._find_entry_points(scan)
         if entry_points:
             insights.append(f"Entry Points: {', '.join(entry_points)}")
         
         # Analyze package.json or requirements.txt for dependencies
-        dependencies = self._analyze_dependencies(repo_path)
+        dependencies = self._analyze_dependencies(repo_path, scan.root_names)
         if dependencies:
             insights.append(f"Key Dependencies: {dependencies}")
         
         return "\n".join(insights)
     
-    def _detect_languages(self, repo_path: Path) -> List[str]:
+    def _detect_languages(self, scan: RepoScan) -> List[str]:
         """Detect programming languages used in the repository."""
-        language_extensions = {
-            '.py': 'Python',
-            '.js': 'JavaScript',
-            '.ts': 'TypeScript',
-            '.java': 'Java',
-            '.go': 'Go',
-            '.rs': 'Rust',
-            '.cpp': 'C++',
-            '.c': 'C',
-            '.cs': 'C#',
-            '.php': 'PHP',
-            '.rb': 'Ruby'
-        }
-        
-        found_languages = set()
-        for file_path in repo_path.rglob('*'):
-            if file_path.is_file() and file_path.suffix in language_extensions:
-                found_languages.add(language_extensions[file_path.suffix])
-        
-        return list(found_languages)
+        return list(scan.languages)
     
-    def _detect_frameworks(self, repo_path: Path) -> List[str]:
+    def _detect_frameworks(self, repo_path: Path, root_names: Set[str]) -> List[str]:
         """Detect frameworks and libraries used."""
         frameworks = []
         
-        # Check for common framework indicators
-        framework_indicators = {
-            'package.json': ['react', 'vue', 'angular', 'express', 'fastify', 'next'],
-            'requirements.txt': ['django', 'flask', 'fastapi', 'tornado'],
-            'pom.xml': ['spring', 'hibernate'],
-            'go.mod': ['gin', 'echo', 'fiber'],
-            'Cargo.toml': ['actix', 'rocket', 'warp']
-        }
-        
-        for file_name, framework_list in framework_indicators.items():
-            file_path = repo_path / file_name
-            if file_path.exists():
-                content = file_path.read_text(encoding='utf-8', errors='ignore')
-                for framework in framework_list:
-                    if framework in content.lower():
-                        frameworks.append(framework.title())
+        for file_name, framework_list in _FRAMEWORK_INDICATORS.items():
+            if file_name in root_names:
+                file_path = repo_path / file_name
+                # Only ASCII tokens are searched for, so a byte-level lowercase is enough
+                content = read_prefix(file_path, _FRAMEWORK_SCAN_BYTES).lower()
+                
+                frameworks.extend(framework.title() for framework in framework_list
+                                  if _FRAMEWORK_TOKENS[framework] in content)
         
         return frameworks
     
-    def _find_entry_points(self, repo_path: Path) -> List[str]:
+    def _find_entry_points(self, scan: RepoScan) -> List[str]:
         """Find main entry points of the application."""
-        entry_points = []
-        
-        common_entry_files = [
-            'main.py', 'app.py', 'server.py', 'index.js', 'main.js',
-            'app.js', 'server.js', 'main.go', 'main.java', 'Program.cs'
-        ]
-        
-        for entry_file in common_entry_files:
-            if (repo_path / entry_file).exists():
-                entry_points.append(entry_file)
-        
-        return entry_points
+        return list(scan.entry_points)
     
-    def _analyze_dependencies(self, repo_path: Path) -> str:
+    def _analyze_dependencies(self, repo_path: Path, root_names: Set[str]) -> str:
         """Analyze project dependencies."""
         dependencies = []
         
         # Python requirements
-        req_file = repo_path / 'requirements.txt'
-        if req_file.exists():
-            content = req_file.read_text(encoding='utf-8', errors='ignore')
-            deps = [line.split('==')[0].split('>=')[0].split('~=')[0] 
-                   for line in content.split('\n') if line.strip() and not line.startswith('#')]
-            dependencies.extend(deps[:5])  # Top 5 dependencies
+        if 'requirements.txt' in root_names:
+            req_file = repo_path / 'requirements.txt'
+            deps = []
+            for line in iter_lines(req_file):
+                # Comments and pip options (-r, -e, --index-url, ...) are not packages
+                if line.lstrip().startswith((b'#', b'-')):
+                    continue
+                match = _REQUIREMENT_NAME.match(line)
+                if match:
+                    deps.append(match.group(1).decode('utf-8', errors='ignore'))
+                    if len(deps) == 5:  # Top 5 dependencies
+                        break
+            dependencies.extend(deps)
         
         # Node.js package.json
-        package_file = repo_path / 'package.json'
-        if package_file.exists():
+        if 'package.json' in root_names:
+            package_file = repo_path / 'package.json'
             try:
-                with open(package_file, 'r', encoding='utf-8') as f:
-                    package_data = json.load(f)
-                    deps = list(package_data.get('dependencies', {}).keys())
-                    dependencies.extend(deps[:5])  # Top 5 dependencies
+                package_data = json_loads(package_file.read_bytes())
+                dependencies.extend(islice(package_data.get('dependencies', {}), 5))  # Top 5 dependencies
             except:
                 pass
         
@@ -123,64 +131,186 @@ class CodeAnalyzer:
 class APISpecAnalyzer:
     """Analyzes API specifications and documentation."""
     
-    def find_api_specs(self, repo_path: Path) -> str:
+    def find_api_specs(self, repo_path: Path, scan: Optional[RepoScan] = None) -> str:
         """Find and analyze API specifications."""
         specs = []
+        if scan is None:
+            scan = FileUtils().walk_repo(repo_path)
+        
+        # Look for OpenAPI/Swagger specs, parsing them concurrently
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            spec_contents = list(executor.map(self._extract_api_info, scan.api_spec_paths))
         
-        # Look for OpenAPI/Swagger specs
-        openapi_files = list(repo_path.rglob('*openapi*')) + list(repo_path.rglob('*swagger*'))
-        for spec_file in openapi_files:
-            if spec_file.suffix in ['.yaml', '.yml', '.json']:
-                specs.append(f"OpenAPI Spec: {spec_file.name}")
-                content = self._extract_api_info(spec_file)
-                if content:
-                    specs.append(content)
+        for spec_file, content in zip(scan.api_spec_paths, spec_contents):
+            specs.append(f"OpenAPI Spec: {spec_file.name}")
+            if content:
+                specs.append(content)
         
         # Look for GraphQL schemas
-        graphql_files = list(repo_path.rglob('*.graphql')) + list(repo_path.rglob('*schema*'))
-        for schema_file in graphql_files:
-            if schema_file.suffix in ['.graphql', '.gql']:
-                specs.append(f"GraphQL Schema: {schema_file.name}")
+        for schema_file in scan.graphql_paths:
+            specs.append(f"GraphQL Schema: {schema_file.name}")
         
         # Look for API documentation in common locations
-        api_docs = list(repo_path.rglob('*api*')) + list(repo_path.rglob('*docs*'))
-        for doc_path in api_docs:
-            if doc_path.is_dir():
-                md_files = list(doc_path.rglob('*.md'))
-                if md_files:
-                    specs.append(f"API Documentation: {doc_path.name}/")
+        for doc_path in scan.api_doc_dirs:
+            specs.append(f"API Documentation: {doc_path.name}/")
         
         return '\n'.join(specs) if specs else "No API specifications found"
     
     def _extract_api_info(self, spec_file: Path) -> Optional[str]:
         """Extract key information from API specification files."""
         try:
-            content = spec_file.read_text(encoding='utf-8', errors='ignore')
-            
             if spec_file.suffix == '.json':
-                spec_data = json.loads(content)
+                summary = self._summarize_json_spec(spec_file)
             else:
-                spec_data = yaml.safe_load(content)
+                summary = self._summarize_yaml_spec(spec_file)
+            
+            if summary is None:
+                return None
+            spec_info, endpoint_count, endpoints = summary
             
             info = []
             
             # Extract basic info
-            if 'info' in spec_data:
-                title = spec_data['info'].get('title', 'Unknown')
-                version = spec_data['info'].get('version', 'Unknown')
+            if spec_info is not None:
+                title = spec_info.get('title', 'Unknown')
+                version = spec_info.get('version', 'Unknown')
                 info.append(f"  Title: {title}, Version: {version}")
             
             # Extract paths/endpoints
-            if 'paths' in spec_data:
-                endpoint_count = len(spec_data['paths'])
+            if endpoint_count is not None:
                 info.append(f"  Endpoints: {endpoint_count}")
                 
                 # List first few endpoints
-                endpoints = list(spec_data['paths'].keys())[:3]
                 if endpoints:
                     info.append(f"  Sample endpoints: {', '.join(endpoints)}")
             
             return '\n'.join(info)
             
         except Exception:
-            return None
\ No newline at end of file
+            return None
+    
+    def _summarize_json_spec(self, spec_file: Path) -> Optional[Tuple[Optional[Dict], Optional[int], List[str]]]:
+        """Collect info, endpoint count and sample endpoints from a JSON spec.
+        
+        Specs above _SPEC_STREAM_BYTES are parsed as an ijson event stream when
+        it is available, so no document tree is built for them and parsing
+        stops once info and paths are done.
+        """
+        if ijson is None or spec_file.stat().st_size <= _SPEC_STREAM_BYTES:
+            spec_data = json_loads(spec_file.read_bytes())
+            if not isinstance(spec_data, dict):
+                return None
+            spec_info = spec_data.get('info')
+            paths = spec_data.get('paths')
+            if paths is None:
+                return spec_info, None, []
+            return spec_info, len(paths), list(islice(paths, 3))
+        
+        spec_info = None
+        endpoint_count = None
+        endpoints = []
+        info_done = paths_done = False
+        
+        with open(spec_file, 'rb') as f:
+            for prefix, event, value in ijson.parse(f):
+                if prefix == '':
+                    if event in ('start_array', 'string', 'number', 'boolean', 'null'):
+                        return None
+                elif prefix == 'info':
+                    if event == 'start_map':
+                        spec_info = {}
+                    elif event == 'end_map':
+                        info_done = True
+                elif prefix in ('info.title', 'info.version'):
+                    if event in ('string', 'number', 'boolean', 'null'):
+                        spec_info[prefix[5:]] = value
+                elif prefix == 'paths':
+                    if event == 'start_map':
+                        endpoint_count = 0
+                    elif event == 'map_key':
+                        endpoint_count += 1
+                        if len(endpoints) < 3:
+                            endpoints.append(value)
+                    elif event == 'end_map':
+                        paths_done = True
+                
+                if info_done and paths_done:
+                    break
+        
+        return spec_info, endpoint_count, endpoints
+    
+    def _summarize_yaml_spec(self, spec_file: Path) -> Optional[Tuple[Optional[Dict], Optional[int], List[str]]]:
+        """Collect info, endpoint count and sample endpoints from a YAML spec.
+        
+        Walks the parser's event stream instead of composing the document,
+        skipping every value except the top-level info and paths keys.
+        """
+        spec_info = None
+        endpoint_count = None
+        endpoints = []
+        
+        with open(spec_file, 'rb') as f:
+            events = yaml.parse(f, Loader=SafeLoader)
+            
+            # Find the root mapping of the first document
+            for event in events:
+                if isinstance(event, yaml.MappingStartEvent):
+                    break
+                if isinstance(event, yaml.NodeEvent):
+                    return None
+            else:
+                return None
+            
+            for key, value in self._iter_yaml_mapping(events):
+                if key == 'info' and isinstance(value, yaml.MappingStartEvent):
+                    spec_info = {}
+                    for info_key, info_value in self._iter_yaml_mapping(events):
+                        if info_key in ('title', 'version') and isinstance(info_value, yaml.ScalarEvent):
+                            spec_info[info_key] = info_value.value
+                        else:
+                            self._skip_yaml_node(events, info_value)
+                elif key == 'paths' and isinstance(value, yaml.MappingStartEvent):
+                    endpoint_count = 0
+                    for path, operations in self._iter_yaml_mapping(events):
+                        endpoint_count += 1
+                        if len(endpoints) < 3:
+                            endpoints.append(path)
+                        self._skip_yaml_node(events, operations)
+                else:
+                    self._skip_yaml_node(events, value)
+                
+                if spec_info is not None and endpoint_count is not None:
+                    break
+        
+        return spec_info, endpoint_count, endpoints
+    
+    def _iter_yaml_mapping(self, events: Iterator[yaml.Event]) -> Iterator[Tuple[Optional[str], yaml.Event]]:
+        """Yield (key, first value event) pairs until the current mapping ends.
+        
+        Callers must consume or skip each value before asking for the next pair.
+        Non-scalar keys are skipped and reported as None.
+        """
+        for key_event in events:
+            if isinstance(key_event, yaml.MappingEndEvent):
+                return
+            
+            key = None
+            if isinstance(key_event, yaml.ScalarEvent):
+                key = key_event.value
+            else:
+                self._skip_yaml_node(events, key_event)
+            yield key, next(events)
+    
+    def _skip_yaml_node(self, events: Iterator[yaml.Event], first: yaml.Event) -> None:
+        """Consume the rest of the node that starts with the given event."""
+        if not isinstance(first, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            return
+        
+        depth = 1
+        for event in events:
+            if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                depth += 1
+            elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                depth -= 1
+                if depth == 0:
+                    return
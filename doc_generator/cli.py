@@ -43,6 +43,12 @@ def main():
         help="API base URL (default: %(default)s)"
     )
     
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Regenerate documentation even if a cached copy exists for this commit"
+    )
+    
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -82,7 +88,8 @@ def main():
             print(f"📥 Cloning and analyzing repository: {args.git_url}")
         
         # Generate documentation
-        documentation = generator.generate_from_git(args.git_url, output_path)
+        documentation = generator.generate_from_git(args.git_url, output_path, use_cache=not args.no_cache)
+        generator.close()
         
         print(f"✅ Documentation generated successfully!")
         print(f"📄 Output saved to: {output_path}")
@@ -1,134 +1,400 @@
+import asyncio
+import hashlib
 import os
 import tempfile
 import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, TextIO
 import git
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI, Timeout
 
 from .analyzers import CodeAnalyzer, APISpecAnalyzer
-from .utils import FileUtils
+from .utils import FileUtils, json_loads
+
+
+PROMPT_TEMPLATE = """
+You are a technical documentation expert. Generate comprehensive service documentation based on the following repository analysis:
+
+{context}
+
+Generate a well-structured markdown document that includes:
+
+1. **Service Overview** - What this service does, its purpose and main functionality
+2. **Architecture** - High-level architecture and key components
+3. **API Documentation** - Endpoints, request/response formats, authentication
+4. **Setup & Installation** - How to set up and run the service
+5. **Configuration** - Environment variables, config files, and settings
+6. **Usage Examples** - Code examples and common use cases
+7. **Dependencies** - Key libraries and external services
+8. **Development** - How to contribute, build, test, and deploy
+
+Make the documentation clear, comprehensive, and developer-friendly. Use proper markdown formatting with headers, code blocks, and tables where appropriate.
+"""
+
+# Streaming a long completion can pause between chunks well beyond the connect timeout
+HTTP_TIMEOUT = Timeout(60.0, read=300.0)
+
+# Generated documentation is reused for this long before being regenerated
+DEFAULT_CACHE_TTL = 7 * 24 * 60 * 60
+
+
+def _parse_stream_delta(line: str) -> Optional[str]:
+    """Extract the content delta from one server-sent event line of a completion stream.
+    
+    Reading the raw frames avoids building a Pydantic chunk model per token.
+    """
+    if not line.startswith('data:'):
+        return None
+    
+    data = line[5:].lstrip()
+    if data == '[DONE]':
+        return None
+    
+    payload = json_loads(data)
+    if not isinstance(payload, dict):
+        return None
+    
+    # Same check as the SDK's own stream: a null or empty error is not an error
+    error = payload.get('error')
+    if error:
+        raise RuntimeError(error.get('message', error) if isinstance(error, dict) else str(error))
+    
+    choices = payload.get('choices')
+    if not choices:
+        return None
+    return (choices[0].get('delta') or {}).get('content')
 
 
 class ServiceDocGenerator:
     """Main class for generating service documentation from Git repositories."""
     
-    def __init__(self, api_key: Optional[str] = None, base_url: str = "https://integrate.api.nvidia.com/v1"):
+    def __init__(self, api_key: Optional[str] = None, base_url: str = "https://integrate.api.nvidia.com/v1",
+                 cache_dir: Optional[str] = None, cache_ttl: int = DEFAULT_CACHE_TTL):
         """Initialize the documentation generator.
         
         Args:
             api_key: NVIDIA API key (defaults to NVIDIA_API_KEY env var)
             base_url: API base URL for NVIDIA integration
+            cache_dir: Directory for cached documentation (defaults to ~/.cache/docweave)
+            cache_ttl: Seconds a cached document stays valid
         """
         self.api_key = api_key or os.getenv("NVIDIA_API_KEY")
         if not self.api_key:
             raise ValueError("API key is required. Set NVIDIA_API_KEY env var or pass api_key parameter.")
         
         print("Generating docs....")
+        self.base_url = base_url
+        # One HTTP/2 connection pool per client, reused for every completion
         self.client = OpenAI(
             base_url=base_url,
-            api_key=self.api_key
+            api_key=self.api_key,
+            http_client=DefaultHttpxClient(http2=True, timeout=HTTP_TIMEOUT)
         )
+        # Async connections are bound to the loop that opened them, so each
+        # event loop gets its own client, created on first use
+        self._async_clients: Dict[asyncio.AbstractEventLoop, AsyncOpenAI] = {}
         
         self.code_analyzer = CodeAnalyzer()
         self.api_analyzer = APISpecAnalyzer()
         self.file_utils = FileUtils()
+        
+        self.cache_dir = Path(cache_dir) if cache_dir else Path.home() / '.cache' / 'docweave'
+        self.cache_ttl = cache_ttl
     
-    def generate_from_git(self, git_url: str, output_path: Optional[str] = None) -> str:
+    def generate_from_git(self, git_url: str, output_path: Optional[str] = None, use_cache: bool = True) -> str:
         """Generate documentation from a Git repository.
         
         Args:
             git_url: URL of the Git repository to analyze
             output_path: Optional path to save the generated documentation
+            use_cache: Reuse documentation previously generated for the same commit
             
         Returns:
             Generated documentation as markdown string
         """
+        # A cached result for the current commit skips clone, analysis and LLM call
+        if use_cache:
+            documentation = self._lookup_cache(git_url)
+            if documentation is not None:
+                print("Done (cached)")
+                self._save_output(output_path, documentation)
+                return documentation
+        
         with tempfile.TemporaryDirectory() as temp_dir:
             # Clone repository
             repo_path = self._clone_repository(git_url, temp_dir)
             
+            # Key the cache by the commit actually cloned, the branch may have moved since the lookup
+            commit_sha = self._resolve_commit_sha(str(repo_path)) if use_cache else None
+            
             # Analyze repository
             analysis = self._analyze_repository(repo_path)
             
-            # Generate documentation using LLM
-            documentation = self._generate_documentation(analysis)
+            # Generate documentation using LLM, streaming it to the output file if provided
+            with self._open_output(output_path) as sink:
+                documentation = self._generate_documentation(analysis, sink)
             print("Done")
-            # Save to file if output path provided
-            if output_path:
-                with open(output_path, 'w+', encoding='utf-8') as f:
-                    f.write(documentation)
+            if commit_sha:
+                self._write_cache(self._cache_path(commit_sha), documentation)
             
             return documentation
     
+    async def generate_from_git_async(self, git_url: str, output_path: Optional[str] = None,
+                                      use_cache: bool = True) -> str:
+        """Asynchronous variant of generate_from_git.
+        
+        Cloning, analysis, file writes and cleanup run in the default executor
+        and the completion is streamed with the async client, so several
+        repositories can be documented concurrently with asyncio.gather.
+        The output file is written once the completion has finished.
+        """
+        loop = asyncio.get_running_loop()
+        
+        if use_cache:
+            documentation = await loop.run_in_executor(None, self._lookup_cache, git_url)
+            if documentation is not None:
+                print("Done (cached)")
+                await loop.run_in_executor(None, self._save_output, output_path, documentation)
+                return documentation
+        
+        temp_dir = await loop.run_in_executor(None, tempfile.mkdtemp)
+        try:
+            repo_path = await loop.run_in_executor(None, self._clone_repository, git_url, temp_dir)
+            commit_sha = None
+            if use_cache:
+                commit_sha = await loop.run_in_executor(None, self._resolve_commit_sha, str(repo_path))
+            analysis = await loop.run_in_executor(None, self._analyze_repository, repo_path)
+            
+            documentation = await self._generate_documentation_async(analysis)
+            print("Done")
+            await loop.run_in_executor(None, self._save_output, output_path, documentation)
+            if commit_sha:
+                await loop.run_in_executor(None, self._write_cache, self._cache_path(commit_sha), documentation)
+            
+            return documentation
+        finally:
+            await loop.run_in_executor(None, partial(shutil.rmtree, temp_dir, ignore_errors=True))
+    
+    def close(self) -> None:
+        """Close the synchronous client's connection pool."""
+        self.client.close()
+    
+    async def aclose(self) -> None:
+        """Close the async client's connection pool for the running event loop."""
+        async_client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if async_client is not None:
+            await async_client.close()
+    
+    def clear_cache(self) -> None:
+        """Remove all cached documentation."""
+        if self.cache_dir.is_dir():
+            for cache_file in self.cache_dir.glob('*.md'):
+                cache_file.unlink()
+    
+    def _lookup_cache(self, git_url: str) -> Optional[str]:
+        """Return valid cached documentation for the repository's current commit, if any."""
+        commit_sha = self._resolve_commit_sha(git_url)
+        if not commit_sha:
+            return None
+        
+        return self._read_cache(self._cache_path(commit_sha))
+    
+    def _save_output(self, output_path: Optional[str], documentation: str) -> None:
+        """Write documentation to the output path if one was given."""
+        with self._open_output(output_path) as f:
+            if f is not None:
+                f.write(documentation)
+    
+    @contextmanager
+    def _open_output(self, output_path: Optional[str]) -> Iterator[Optional[TextIO]]:
+        """Open a buffered writer that replaces output_path only if the block succeeds.
+        
+        Writes go to a temporary file next to the output, so a failed generation
+        leaves any existing file untouched. Yields None when there is no output path.
+        """
+        if not output_path:
+            yield None
+            return
+        
+        temp_path = f"{output_path}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            with open(temp_path, 'x', encoding='utf-8', buffering=1 << 20) as f:
+                yield f
+            os.replace(temp_path, output_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+    
+    def _resolve_commit_sha(self, git_url: str) -> Optional[str]:
+        """Resolve the commit that would be analyzed without cloning it.
+        
+        Returns None when the commit cannot be determined or a local checkout
+        has uncommitted changes, which disables caching for that run.
+        """
+        try:
+            if os.path.isdir(git_url):
+                repo = git.Repo(git_url)
+                if repo.is_dirty(untracked_files=True):
+                    return None
+                return repo.head.commit.hexsha
+            
+            output = git.cmd.Git().ls_remote(git_url, 'HEAD', env={'GIT_TERMINAL_PROMPT': '0'})
+            return output.split()[0] if output else None
+        except Exception:
+            return None
+    
+    def _cache_path(self, commit_sha: str) -> Path:
+        """Cache file for a commit, also keyed by the prompt so edits invalidate it."""
+        prompt_hash = hashlib.sha256(PROMPT_TEMPLATE.encode('utf-8')).hexdigest()
+        key = hashlib.sha256(f"{commit_sha}:{prompt_hash}".encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.md"
+    
+    def _read_cache(self, cache_path: Path) -> Optional[str]:
+        """Return cached documentation if present and not expired."""
+        try:
+            if time.time() - cache_path.stat().st_mtime > self.cache_ttl:
+                return None
+            return cache_path.read_text(encoding='utf-8')
+        except OSError:
+            return None
+    
+    def _write_cache(self, cache_path: Path, documentation: str) -> None:
+        """Atomically store documentation so readers never see a partial file."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(documentation)
+                os.replace(temp_path, cache_path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError:
+            pass
+    
     def _clone_repository(self, git_url: str, temp_dir: str) -> Path:
-        """Clone the Git repository to a temporary directory."""
+        """Clone the Git repository to a temporary directory.
+        
+        Only the latest snapshot is fetched since the analysis never looks at
+        history. Local directories are analyzed in place without cloning.
+        """
+        if os.path.isdir(git_url):
+            return Path(git_url)
+        
         repo_name = git_url.split('/')[-1].replace('.git', '')
         repo_path = Path(temp_dir) / repo_name
         
         try:
-            git.Repo.clone_from(git_url, repo_path)
+            git.Repo.clone_from(
+                git_url,
+                repo_path,
+                depth=1,
+                single_branch=True,
+                multi_options=['--filter=blob:none', '--no-tags'],
+                env={'GIT_TERMINAL_PROMPT': '0'}
+            )
             return repo_path
         except Exception as e:
             raise RuntimeError(f"Failed to clone repository {git_url}: {e}")
     
     def _analyze_repository(self, repo_path: Path) -> Dict:
         """Analyze the repository structure and extract relevant information."""
-        analysis = {
-            'structure': self.file_utils.get_project_structure(repo_path),
-            'readme': self.file_utils.find_readme(repo_path),
-            'api_specs': self.api_analyzer.find_api_specs(repo_path),
-            'code_analysis': self.code_analyzer.analyze_codebase(repo_path),
-            'config_files': self.file_utils.find_config_files(repo_path)
-        }
+        # Walk the tree once and share the result with every analyzer
+        scan = self.file_utils.walk_repo(repo_path)
+        analysis = {'structure': '\n'.join(scan.structure_lines)}
+        
+        # The remaining analyses are independent file reads, so overlap them
+        tasks = [
+            ('readme', self.file_utils.find_readme),
+            ('api_specs', self.api_analyzer.find_api_specs),
+            ('code_analysis', self.code_analyzer.analyze_codebase),
+            ('config_files', self.file_utils.find_config_files)
+        ]
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = [(key, executor.submit(task, repo_path, scan)) for key, task in tasks]
+            for key, future in futures:
+                analysis[key] = future.result()
         
         return analysis
     
-    def _generate_documentation(self, analysis: Dict) -> str:
-        """Generate documentation using LLM based on repository analysis."""
+    def _generate_documentation(self, analysis: Dict, sink: Optional[TextIO] = None) -> str:
+        """Generate documentation using LLM based on repository analysis.
         
-        # Prepare context for LLM
-        context = self._prepare_llm_context(analysis)
-        
-        prompt = f"""
-You are a technical documentation expert. Generate comprehensive service documentation based on the following repository analysis:
-
-{context}
-
-Generate a well-structured markdown document that includes:
-
-1. **Service Overview** - What this service does, its purpose and main functionality
-2. **Architecture** - High-level architecture and key components
-3. **API Documentation** - Endpoints, request/response formats, authentication
-4. **Setup & Installation** - How to set up and run the service
-5. **Configuration** - Environment variables, config files, and settings
-6. **Usage Examples** - Code examples and common use cases
-7. **Dependencies** - Key libraries and external services
-8. **Development** - How to contribute, build, test, and deploy
-
-Make the documentation clear, comprehensive, and developer-friendly. Use proper markdown formatting with headers, code blocks, and tables where appropriate.
-"""
-
+        Each streamed chunk is also written to sink as soon as it arrives.
+        """
         try:
-            completion = self.client.chat.completions.create(
-                model="openai/gpt-oss-120b",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                top_p=1,
-                max_tokens=40960,
-                stream=True
-            )
+            parts = []
+            with self.client.chat.completions.with_streaming_response.create(
+                **self._completion_params(analysis)
+            ) as response:
+                for line in response.iter_lines():
+                    delta = _parse_stream_delta(line)
+                    if delta is not None:
+                        parts.append(delta)
+                        if sink is not None:
+                            sink.write(delta)
             
-            documentation = ""
-            for chunk in completion:
-                if chunk.choices[0].delta.content is not None:
-                    documentation += chunk.choices[0].delta.content
+            return ''.join(parts)
             
-            return documentation
+        except Exception as e:
+            raise RuntimeError(f"Failed to generate documentation: {e}")
+    
+    async def _generate_documentation_async(self, analysis: Dict) -> str:
+        """Asynchronous variant of _generate_documentation using the async client."""
+        try:
+            parts = []
+            async with self._get_async_client().chat.completions.with_streaming_response.create(
+                **self._completion_params(analysis)
+            ) as response:
+                async for line in response.iter_lines():
+                    delta = _parse_stream_delta(line)
+                    if delta is not None:
+                        parts.append(delta)
+            
+            return ''.join(parts)
             
         except Exception as e:
             raise RuntimeError(f"Failed to generate documentation: {e}")
     
+    def _get_async_client(self) -> AsyncOpenAI:
+        """Return the async client for the running event loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        # Clients of loops that have since closed can no longer be used or closed
+        for stale_loop in [other for other in self._async_clients if other.is_closed()]:
+            del self._async_clients[stale_loop]
+        
+        async_client = self._async_clients.get(loop)
+        if async_client is None:
+            async_client = AsyncOpenAI(
+                base_url=self.base_url,
+                api_key=self.api_key,
+                http_client=DefaultAsyncHttpxClient(http2=True, timeout=HTTP_TIMEOUT)
+            )
+            self._async_clients[loop] = async_client
+        return async_client
+    
+    def _completion_params(self, analysis: Dict) -> Dict:
+        """Build the streaming chat completion request for a repository analysis."""
+        # Prepare context for LLM
+        context = self._prepare_llm_context(analysis)
+        prompt = PROMPT_TEMPLATE.format(context=context)
+        
+        return {
+            'model': "openai/gpt-oss-120b",
+            'messages': [{"role": "user", "content": prompt}],
+            'temperature': 0.7,
+            'top_p': 1,
+            'max_tokens': 40960,
+            'stream': True
+        }
+    
     def _prepare_llm_context(self, analysis: Dict) -> str:
         """Prepare context string for LLM from repository analysis."""
         context_parts = []
@@ -137,7 +403,7 @@ Make the documentation clear, comprehensive, and developer-friendly. Use proper
         if analysis['structure']:
             context_parts.append(f"**Project Structure:**\n{analysis['structure']}")
         
-        # README content
+        # README content (only a prefix of the file is ever read)
         if analysis['readme']:
             context_parts.append(f"**Existing README:**\n{analysis['readme'][:2000]}...")
         
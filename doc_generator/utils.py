@@ -1,6 +1,109 @@
+import json
+import mmap
 import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
-from typing import Optional, List
+from typing import Callable, Iterator, List, Optional, Set, Tuple
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    import pathspec
+except ImportError:
+    pathspec = None
+
+
+# Directories that are never descended into (or shown) by any walker;
+# hidden directories and paths matched by the root .gitignore are pruned too
+_PRUNE_DIRS = frozenset((
+    '.git', 'node_modules', '__pycache__', 'venv', 'env', '.venv',
+    'dist', 'build', 'target', '.tox', '.mypy_cache', '.pytest_cache'
+))
+
+# File extensions (without the dot) mapped to the language they indicate
+_LANG_EXT = {
+    'py': 'Python',
+    'js': 'JavaScript',
+    'ts': 'TypeScript',
+    'java': 'Java',
+    'go': 'Go',
+    'rs': 'Rust',
+    'cpp': 'C++',
+    'c': 'C',
+    'cs': 'C#',
+    'php': 'PHP',
+    'rb': 'Ruby'
+}
+
+# Entry point candidates in the order they are reported
+_ENTRY_FILES = (
+    'main.py', 'app.py', 'server.py', 'index.js', 'main.js',
+    'app.js', 'server.js', 'main.go', 'main.java', 'Program.cs'
+)
+
+_CONFIG_FILES = [
+    'config.json', 'config.yaml', 'config.yml',
+    '.env.example', '.env.template',
+    'docker-compose.yml', 'docker-compose.yaml',
+    'Dockerfile', 'Makefile',
+    'package.json', 'requirements.txt', 'setup.py',
+    'pom.xml', 'build.gradle', 'go.mod', 'Cargo.toml'
+]
+
+_README_FILES = ['README.md', 'README.rst', 'README.txt', 'README']
+
+_SPEC_SUFFIXES = ('.yaml', '.yml', '.json')
+_GRAPHQL_SUFFIXES = ('.graphql', '.gql')
+
+# Only the start of the README reaches the LLM context (2000 characters,
+# up to 4 bytes each in UTF-8)
+_README_PREFIX_BYTES = 4 * 2000
+
+# Requirements beyond this many lines are reported as "N+"
+_MAX_REQUIREMENT_LINES = 200
+
+
+def read_prefix(path: Path, size: int) -> bytes:
+    """Read at most size bytes from the start of a file via mmap."""
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return b''
+        with mm:
+            return mm[:size]
+
+
+def iter_lines(path: Path) -> Iterator[bytes]:
+    """Yield the raw lines of a file via mmap without reading it all upfront."""
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return
+        with mm:
+            yield from iter(mm.readline, b'')
+
+
+@dataclass
+class RepoScan:
+    """Everything collected from a single walk over the repository."""
+    structure_lines: List[str] = field(default_factory=list)
+    languages: Set[str] = field(default_factory=set)
+    entry_points: List[str] = field(default_factory=list)
+    config_files: List[str] = field(default_factory=list)
+    api_spec_paths: List[Path] = field(default_factory=list)
+    graphql_paths: List[Path] = field(default_factory=list)
+    api_doc_dirs: List[Path] = field(default_factory=list)
+    readme_path: Optional[Path] = None
+    root_names: Set[str] = field(default_factory=set)
 
 
 class FileUtils:
@@ -8,69 +111,212 @@ class FileUtils:
     
     def get_project_structure(self, repo_path: Path, max_depth: int = 3) -> str:
         """Generate a tree-like structure of the project."""
-        structure_lines = []
+        return "\n".join(self.walk_repo(repo_path, max_depth, structure_only=True).structure_lines)
+    
+    def walk_repo(self, repo_path: Path, max_depth: int = 3, structure_only: bool = False) -> RepoScan:
+        """Walk the repository once and collect everything the analyzers need.
+        
+        The project structure, languages, entry points, configuration files
+        and API spec candidates all come out of the same traversal. With
+        structure_only, only the structure lines are collected and the walk
+        stops below max_depth.
+        """
+        scan = RepoScan(structure_lines=[repo_path.name])
+        ignored = self._gitignore_matcher(repo_path)
+        root_entries = self._list_dir(str(repo_path), sort=True)
+        scan.root_names = {entry.name for entry in root_entries}
+        doc_dirs = {}
         
-        def add_directory(path: Path, prefix: str = "", depth: int = 0):
-            if depth > max_depth:
-                return
+        # Directories already walked, by device and inode, so none is entered twice
+        root_stat = repo_path.stat()
+        visited = {(root_stat.st_dev, root_stat.st_ino)}
+        
+        # Each frame holds the remaining entries of one directory
+        stack = [(self._walk_frame(root_entries, "", 0, max_depth, ignored), 0, ())]
+        while stack:
+            items, depth, docs = stack[-1]
+            item = next(items, None)
+            if item is None:
+                stack.pop()
+                continue
+            
+            entry, line, child_prefix = item
+            if line is not None:
+                scan.structure_lines.append(line)
             
-            items = sorted([item for item in path.iterdir() 
-                          if not item.name.startswith('.') and item.name not in ['node_modules', '__pycache__', 'venv', 'env']])
+            # Only directories inside the rendered structure are needed for the tree itself
+            if structure_only and (child_prefix is None or not entry.is_dir(follow_symlinks=False)):
+                continue
             
-            for i, item in enumerate(items):
-                is_last = i == len(items) - 1
-                current_prefix = "└── " if is_last else "├── "
-                structure_lines.append(f"{prefix}{current_prefix}{item.name}")
+            name = entry.name.lower()
+            # Symlinked directories are never followed, so the walk stays inside the repo
+            if entry.is_dir(follow_symlinks=False):
+                if self._is_pruned_dir(entry, ignored):
+                    continue
                 
-                if item.is_dir() and depth < max_depth:
-                    next_prefix = prefix + ("    " if is_last else "│   ")
-                    add_directory(item, next_prefix, depth + 1)
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                    # DirEntry.stat() reports st_ino/st_dev as 0 on Windows
+                    if st.st_ino == 0:
+                        st = os.stat(entry.path, follow_symlinks=False)
+                except OSError:
+                    continue
+                key = (st.st_dev, st.st_ino)
+                if key in visited:
+                    continue
+                visited.add(key)
+                
+                child_docs = docs
+                if 'api' in name or 'docs' in name:
+                    doc_dirs[entry.path] = False
+                    child_docs = docs + (entry.path,)
+                
+                children = self._list_dir(entry.path, sort=child_prefix is not None)
+                frame = self._walk_frame(children, child_prefix, depth + 1, max_depth, ignored)
+                stack.append((frame, depth + 1, child_docs))
+            
+            elif entry.is_file(follow_symlinks=False):
+                # Stop looking up extensions once every language has been seen
+                if len(scan.languages) < len(_LANG_EXT):
+                    dot = entry.name.rfind('.')
+                    language = _LANG_EXT.get(entry.name[dot + 1:] if dot >= 0 else '')
+                    if language:
+                        scan.languages.add(language)
+                
+                if ('openapi' in name or 'swagger' in name) and name.endswith(_SPEC_SUFFIXES):
+                    scan.api_spec_paths.append(Path(entry.path))
+                elif name.endswith(_GRAPHQL_SUFFIXES):
+                    scan.graphql_paths.append(Path(entry.path))
+                
+                # Markdown marks every enclosing api/docs directory as documentation
+                if name.endswith('.md'):
+                    for doc_dir in docs:
+                        doc_dirs[doc_dir] = True
         
-        structure_lines.append(repo_path.name)
-        add_directory(repo_path)
+        scan.api_doc_dirs = [Path(path) for path, has_markdown in doc_dirs.items() if has_markdown]
+        scan.entry_points = [name for name in _ENTRY_FILES if name in scan.root_names]
+        scan.config_files = [name for name in _CONFIG_FILES if name in scan.root_names]
+        readme = next((name for name in _README_FILES if name in scan.root_names), None)
+        if readme:
+            scan.readme_path = repo_path / readme
+        
+        return scan
+    
+    def _list_dir(self, path: str, sort: bool = False) -> List[os.DirEntry]:
+        """List a directory's entries, optionally sorted by name."""
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            return []
         
-        return "\n".join(structure_lines)
+        if sort:
+            entries.sort(key=lambda entry: entry.name)
+        return entries
     
-    def find_readme(self, repo_path: Path) -> Optional[str]:
+    def _walk_frame(self, entries: List[os.DirEntry], prefix: Optional[str], depth: int, max_depth: int,
+                    ignored: Optional[Callable[[str], bool]]) -> Iterator[Tuple[os.DirEntry, Optional[str], Optional[str]]]:
+        """Pair each entry with its tree line and the prefix for its children.
+        
+        A prefix of None means the directory is outside the rendered structure.
+        """
+        if prefix is None:
+            return ((entry, None, None) for entry in entries)
+        
+        shown = [i for i, entry in enumerate(entries) if self._is_shown(entry, ignored)]
+        last = shown[-1] if shown else -1
+        shown = set(shown)
+        
+        items = []
+        for i, entry in enumerate(entries):
+            if i not in shown:
+                items.append((entry, None, None))
+                continue
+            
+            is_last = i == last
+            line = f"{prefix}{'└── ' if is_last else '├── '}{entry.name}"
+            child_prefix = None
+            if depth < max_depth:
+                child_prefix = prefix + ("    " if is_last else "│   ")
+            items.append((entry, line, child_prefix))
+        
+        return iter(items)
+    
+    def _is_pruned_dir(self, entry: os.DirEntry, ignored: Optional[Callable[[str], bool]]) -> bool:
+        """Whether a directory should be skipped by the walkers."""
+        name = entry.name
+        if name in _PRUNE_DIRS or name.startswith('.'):
+            return True
+        return ignored is not None and ignored(entry.path)
+    
+    def _is_shown(self, entry: os.DirEntry, ignored: Optional[Callable[[str], bool]]) -> bool:
+        """Whether an entry appears in the rendered project structure."""
+        name = entry.name
+        if name in _PRUNE_DIRS or name.startswith('.'):
+            return False
+        return ignored is None or not entry.is_dir() or not ignored(entry.path)
+    
+    def _gitignore_matcher(self, repo_path: Path) -> Optional[Callable[[str], bool]]:
+        """Build a matcher for directory paths ignored by the root .gitignore.
+        
+        Returns None when pathspec is not installed or there is no .gitignore.
+        """
+        if pathspec is None:
+            return None
+        
+        try:
+            lines = (repo_path / '.gitignore').read_text(encoding='utf-8', errors='ignore').splitlines()
+        except OSError:
+            return None
+        
+        spec = pathspec.GitIgnoreSpec.from_lines(lines)
+        root_len = len(str(repo_path)) + 1
+        return lambda path: spec.match_file(path[root_len:] + '/')
+    
+    def list_root_names(self, repo_path: Path) -> Set[str]:
+        """Names of the repository's top-level entries from a single directory read."""
+        return {entry.name for entry in self._list_dir(str(repo_path))}
+    
+    def find_readme(self, repo_path: Path, scan: Optional[RepoScan] = None) -> Optional[str]:
         """Find and read README file content."""
-        readme_patterns = ['README.md', 'README.rst', 'README.txt', 'README']
+        if scan is not None:
+            candidates = [scan.readme_path] if scan.readme_path else []
+        else:
+            root_names = self.list_root_names(repo_path)
+            candidates = [repo_path / pattern for pattern in _README_FILES if pattern in root_names]
         
-        for pattern in readme_patterns:
-            readme_path = repo_path / pattern
-            if readme_path.exists():
-                try:
-                    return readme_path.read_text(encoding='utf-8', errors='ignore')
-                except Exception:
-                    continue
+        for readme_path in candidates:
+            try:
+                return read_prefix(readme_path, _README_PREFIX_BYTES).decode('utf-8', errors='ignore')
+            except Exception:
+                continue
         
         return None
     
-    def find_config_files(self, repo_path: Path) -> str:
+    def find_config_files(self, repo_path: Path, scan: Optional[RepoScan] = None) -> str:
         """Find and analyze configuration files."""
         config_files = []
         
-        # Common configuration file patterns
-        config_patterns = [
-            'config.json', 'config.yaml', 'config.yml',
-            '.env.example', '.env.template',
-            'docker-compose.yml', 'docker-compose.yaml',
-            'Dockerfile', 'Makefile',
-            'package.json', 'requirements.txt', 'setup.py',
-            'pom.xml', 'build.gradle', 'go.mod', 'Cargo.toml'
-        ]
-        
-        for pattern in config_patterns:
-            config_path = repo_path / pattern
-            if config_path.exists():
+        if scan is not None:
+            config_patterns = scan.config_files
+        else:
+            root_names = self.list_root_names(repo_path)
+            config_patterns = [pattern for pattern in _CONFIG_FILES if pattern in root_names]
+        
+        # Extract key information from specific files concurrently
+        extractors = {
+            'package.json': self._extract_package_json_info,
+            'requirements.txt': self._extract_python_info,
+            'setup.py': self._extract_python_info
+        }
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = {pattern: executor.submit(extractors[pattern], repo_path / pattern)
+                       for pattern in config_patterns if pattern in extractors}
+            
+            for pattern in config_patterns:
                 config_files.append(f"- {pattern}")
-                
-                # Extract key information from specific files
-                if pattern == 'package.json':
-                    info = self._extract_package_json_info(config_path)
-                    if info:
-                        config_files.append(f"  {info}")
-                elif pattern in ['requirements.txt', 'setup.py']:
-                    info = self._extract_python_info(config_path)
+                if pattern in futures:
+                    info = futures[pattern].result()
                     if info:
                         config_files.append(f"  {info}")
         
@@ -79,13 +325,11 @@ class FileUtils:
     def _extract_package_json_info(self, package_path: Path) -> Optional[str]:
         """Extract key information from package.json."""
         try:
-            import json
-            with open(package_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = json_loads(package_path.read_bytes())
             
             info_parts = []
             if 'scripts' in data:
-                scripts = list(data['scripts'].keys())[:3]
+                scripts = list(islice(data['scripts'], 3))
                 info_parts.append(f"Scripts: {', '.join(scripts)}")
             
             if 'engines' in data:
@@ -101,15 +345,18 @@ class FileUtils:
     def _extract_python_info(self, file_path: Path) -> Optional[str]:
         """Extract key information from Python configuration files."""
         try:
-            content = file_path.read_text(encoding='utf-8', errors='ignore')
-            
             if file_path.name == 'requirements.txt':
-                lines = [line.strip() for line in content.split('\n') 
-                        if line.strip() and not line.startswith('#')]
-                return f"Dependencies: {len(lines)} packages"
+                count = 0
+                for line in iter_lines(file_path):
+                    if line.strip() and not line.startswith(b'#'):
+                        if count == _MAX_REQUIREMENT_LINES:
+                            return f"Dependencies: {count}+ packages"
+                        count += 1
+                return f"Dependencies: {count} packages"
             elif file_path.name == 'setup.py':
-                if 'python_requires' in content:
-                    return "Python package with setup.py"
+                with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if mm.find(b'python_requires') != -1:
+                        return "Python package with setup.py"
             
             return None
             
@@ -3,11 +3,34 @@
 Example usage of the Service Documentation Generator.
 """
 
+import asyncio
 import os
 from doc_generator import ServiceDocGenerator
 
 
-def main():
+# Maximum number of repositories documented at the same time (API rate limits)
+MAX_CONCURRENT_REPOS = 3
+
+
+async def document_repository(generator: ServiceDocGenerator, repo_url: str, semaphore: asyncio.Semaphore):
+    async with semaphore:
+        print(f"\n🔍 Analyzing repository: {repo_url}")
+        
+        try:
+            # Generate documentation and save it to file
+            repo_name = repo_url.split('/')[-1].replace('.git', '')
+            output_file = f"{repo_name}_documentation.md"
+            
+            documentation = await generator.generate_from_git_async(repo_url, output_file)
+            
+            print(f"✅ Documentation generated: {output_file}")
+            print(f"📄 Preview (first 500 chars):\n{documentation[:500]}...")
+            
+        except Exception as e:
+            print(f"❌ Error generating documentation for {repo_url}: {e}")
+
+
+async def main():
     # Initialize the generator with NVIDIA API configuration
     generator = ServiceDocGenerator(
         base_url="https://integrate.api.nvidia.com/v1",
@@ -21,25 +44,13 @@ def main():
         "https://github.com/expressjs/express.git"
     ]
     
-    for repo_url in example_repos:
-        print(f"\n🔍 Analyzing repository: {repo_url}")
-        
-        try:
-            # Generate documentation
-            documentation = generator.generate_from_git(repo_url)
-            
-            # Save to file
-            repo_name = repo_url.split('/')[-1].replace('.git', '')
-            output_file = f"{repo_name}_documentation.md"
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(documentation)
-            
-            print(f"✅ Documentation generated: {output_file}")
-            print(f"📄 Preview (first 500 chars):\n{documentation[:500]}...")
-            
-        except Exception as e:
-            print(f"❌ Error generating documentation for {repo_url}: {e}")
+    # Clone and analysis of one repository overlap with LLM generation of another
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REPOS)
+    try:
+        await asyncio.gather(*(document_repository(generator, repo_url, semaphore) for repo_url in example_repos))
+    finally:
+        await generator.aclose()
+        generator.close()
 
 
 if __name__ == "__main__":
@@ -49,4 +60,4 @@ if __name__ == "__main__":
         print("   export NVIDIA_API_KEY='your-api-key-here'")
         exit(1)
     
-    main()
\ No newline at end of file
+    asyncio.run(main())
@@ -5,9 +5,13 @@ setup(
     version="1.0.0",
     packages=find_packages(),
     install_requires=[
-        "openai>=1.0.0",
+        "openai>=1.17.0",
+        "httpx[http2]>=0.24.0",
         "gitpython>=3.1.0",
         "pyyaml>=6.0",
+        "orjson>=3.9.0",
+        "ijson>=3.2.0",
+        "pathspec>=0.11.0",
         "requests>=2.28.0",
         "python-dotenv>=1.0.0",
     ],